@@ -54,18 +54,23 @@ class BusinessMetricsCalculator:
         """
         current_data = self.sales_data[self.sales_data['purchase_year'] == current_year]
         
+        total_revenue = current_data['price'].sum()
+        # Sales data has one row per order item; count distinct order IDs
+        total_orders = len(pd.factorize(current_data['order_id'].values, sort=False)[1])
+        
         metrics = {
-            'total_revenue': current_data['price'].sum(),
-            'total_orders': current_data['order_id'].nunique(),
-            'average_order_value': current_data.groupby('order_id')['price'].sum().mean(),
+            'total_revenue': total_revenue,
+            'total_orders': total_orders,
+            # Mean of per-order totals without building the per-order series
+            'average_order_value': total_revenue / total_orders if total_orders > 0 else np.nan,
             'total_items_sold': len(current_data)
         }
         
         if previous_year:
             previous_data = self.sales_data[self.sales_data['purchase_year'] == previous_year]
             prev_revenue = previous_data['price'].sum()
-            prev_orders = previous_data['order_id'].nunique()
-            prev_aov = previous_data.groupby('order_id')['price'].sum().mean()
+            prev_orders = len(pd.factorize(previous_data['order_id'].values, sort=False)[1])
+            prev_aov = prev_revenue / prev_orders if prev_orders > 0 else np.nan
             
             metrics.update({
                 'revenue_growth_rate': ((metrics['total_revenue'] - prev_revenue) / prev_revenue * 100) if prev_revenue > 0 else 0,
@@ -96,9 +101,7 @@ class BusinessMetricsCalculator:
         }).reset_index()
         
         monthly_metrics.columns = ['month', 'revenue', 'orders']
-        monthly_metrics['avg_order_value'] = year_data.groupby('purchase_month').apply(
-            lambda x: x.groupby('order_id')['price'].sum().mean()
-        ).values
+        monthly_metrics['avg_order_value'] = monthly_metrics['revenue'] / monthly_metrics['orders']
         
         # Calculate growth rates
         monthly_metrics['revenue_growth'] = monthly_metrics['revenue'].pct_change() * 100
@@ -123,7 +126,7 @@ class BusinessMetricsCalculator:
         if 'product_category_name' not in year_data.columns:
             return {'error': 'Product category data not available'}
         
-        category_metrics = year_data.groupby('product_category_name').agg({
+        category_metrics = year_data.groupby('product_category_name', observed=True).agg({
             'price': ['sum', 'mean', 'count'],
             'order_id': 'nunique'
         }).round(2)
@@ -155,15 +158,13 @@ class BusinessMetricsCalculator:
         if 'customer_state' not in year_data.columns:
             return pd.DataFrame({'error': ['Geographic data not available']})
         
-        state_metrics = year_data.groupby('customer_state').agg({
+        state_metrics = year_data.groupby('customer_state', observed=True).agg({
             'price': 'sum',
             'order_id': 'nunique'
         }).reset_index()
         
         state_metrics.columns = ['state', 'revenue', 'orders']
-        state_metrics['avg_order_value'] = year_data.groupby('customer_state').apply(
-            lambda x: x.groupby('order_id')['price'].sum().mean()
-        ).values
+        state_metrics['avg_order_value'] = state_metrics['revenue'] / state_metrics['orders']
         
         state_metrics = state_metrics.sort_values('revenue', ascending=False)
         return state_metrics
@@ -189,9 +190,10 @@ class BusinessMetricsCalculator:
         metrics = {
             'avg_review_score': order_data['review_score'].mean(),
             'total_reviews': order_data['review_score'].count(),
-            'score_5_percentage': (order_data['review_score'] == 5).mean() * 100,
-            'score_4_plus_percentage': (order_data['review_score'] >= 4).mean() * 100,
-            'score_1_2_percentage': (order_data['review_score'] <= 2).mean() * 100
+            # Orders without a review count as not matching, hence fillna(False)
+            'score_5_percentage': (order_data['review_score'] == 5).fillna(False).mean() * 100,
+            'score_4_plus_percentage': (order_data['review_score'] >= 4).fillna(False).mean() * 100,
+            'score_1_2_percentage': (order_data['review_score'] <= 2).fillna(False).mean() * 100
         }
         
         return metrics
@@ -8,12 +8,9 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import calendar
-import warnings
 
 from data_loader import EcommerceDataLoader, load_and_process_data
 
-warnings.filterwarnings('ignore')
-
 # Page configuration
 st.set_page_config(
     page_title="E-commerce Analytics Dashboard",
@@ -29,6 +26,18 @@ st.markdown("""
         padding-top: 2rem;
     }
 
+    .kpi-grid {
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 1rem;
+    }
+
+    .bottom-grid {
+        display: grid;
+        grid-template-columns: repeat(2, 1fr);
+        gap: 1rem;
+    }
+
     .metric-card {
         background: white;
         padding: 1rem 1.25rem;
@@ -97,21 +106,98 @@ st.markdown("""
 # Data loading
 # ---------------------------------------------------------------------------
 
+def summarize_sales(sales_data):
+    """Aggregate a sales dataset into the small tables behind every KPI and chart.
+
+    Every table is indexed by (purchase_year, purchase_month, ...), so a
+    filter change only slices and sums a few hundred pre-aggregated rows.
+    Means are stored as total/count pairs so they combine across months.
+    """
+    period = ['purchase_year', 'purchase_month']
+    has_delivery = 'delivery_days' in sales_data.columns
+    has_reviews = 'review_score' in sales_data.columns
+
+    # Sums of the small nullable-int columns could overflow their dtype
+    sales_data = sales_data.astype(
+        {col: 'float64' for col in ['delivery_days', 'review_score']
+         if col in sales_data.columns})
+
+    aggs = dict(revenue=('price', 'sum'), orders=('order_id', 'nunique'))
+    if has_delivery:
+        aggs.update(delivery_total=('delivery_days', 'sum'),
+                    delivery_count=('delivery_days', 'count'))
+    if has_reviews:
+        aggs.update(review_total=('review_score', 'sum'),
+                    review_count=('review_score', 'count'))
+    summaries = {'kpi_by_month': sales_data.groupby(period).agg(**aggs)}
+
+    for key, column in [('category_revenue', 'product_category_name'),
+                        ('state_revenue', 'customer_state')]:
+        if column in sales_data.columns:
+            summaries[key] = (sales_data.groupby(period + [column],
+                                                 observed=True)
+                              ['price'].sum())
+
+    if has_delivery and has_reviews:
+        # Right-closed bins: <=3, 4-7 and 8+ days. Missing delivery_days
+        # fall outside every bin and are dropped by the groupby.
+        buckets = pd.cut(sales_data['delivery_days'],
+                         bins=[-np.inf, 3, 7, np.inf],
+                         labels=['1-3 days', '4-7 days', '8+ days'])
+        summaries['delivery_satisfaction'] = (
+            sales_data.groupby(period + [buckets.rename('delivery_bucket')],
+                               observed=True)['review_score']
+            .agg(review_total='sum', review_count='count'))
+
+    return summaries
+
+
 @st.cache_data
 def load_dashboard_data():
     """Load and cache data for dashboard."""
     try:
         loader, processed_data = load_and_process_data('ecommerce_data/')
-        return loader, processed_data
+        dashboard_data = dict(processed_data)
+        dashboard_data['available_years'] = sorted(
+            processed_data['orders']['purchase_year'].unique().tolist(),
+            reverse=True)
+        dashboard_data.update(summarize_sales(
+            loader.create_sales_dataset(status_filter='delivered')))
+        return loader, dashboard_data
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None, None
 
 
+def select_period(table, year, month=None):
+    """Rows of a (purchase_year, purchase_month)-indexed table for one period."""
+    mask = table.index.get_level_values('purchase_year') == year
+    if month is not None:
+        mask &= table.index.get_level_values('purchase_month') == month
+    return table[mask]
+
+
+def sum_period(table, year, month, level):
+    """Sum a pre-aggregated table over one period, grouped by ``level``."""
+    return (select_period(table, year, month)
+            .groupby(level=level, observed=True).sum())
+
+
+def safe_ratio(total, count):
+    """``total / count``, or NaN when nothing was counted."""
+    return total / count if count else np.nan
+
+
 # ---------------------------------------------------------------------------
 # Formatting helpers
 # ---------------------------------------------------------------------------
 
+# Star strings indexed by rounded score, and (arrow, css class) by "is up"
+STARS = tuple("\u2605" * n + "\u2606" * (5 - n) for n in range(6))
+ARROWS = {True: ("\u2197", "trend-positive"),    # ↗
+          False: ("\u2198", "trend-negative")}   # ↘
+
+
 def format_currency_short(value):
     """Format currency with K/M suffixes (e.g. $300K, $2M)."""
     if abs(value) >= 1e6:
@@ -123,49 +209,52 @@ def format_currency_short(value):
 
 def format_trend(current, previous):
     """Return an HTML span with arrow and two-decimal-place percentage."""
-    if previous == 0 or pd.isna(previous):
+    # pd.isna first: means over empty nullable-int columns return pd.NA
+    if pd.isna(current) or pd.isna(previous) or previous == 0:
         return "N/A"
     change_pct = ((current - previous) / previous) * 100
-    arrow = "\u2197" if change_pct >= 0 else "\u2198"        # ↗ / ↘
-    css = "trend-positive" if change_pct >= 0 else "trend-negative"
+    arrow, css = ARROWS[change_pct >= 0]
     return f'<span class="{css}">{arrow} {abs(change_pct):.2f}%</span>'
 
 
-def _tick_currency(value):
-    """Plotly tickformat callback string isn't flexible enough, so we build
-    tick values / text ourselves for K/M formatting."""
-    if abs(value) >= 1e6:
-        return f"${value / 1e6:.1f}M"
-    elif abs(value) >= 1e3:
-        return f"${value / 1e3:.0f}K"
-    return f"${value:,.0f}"
-
-
 # ---------------------------------------------------------------------------
 # Chart builders
 # ---------------------------------------------------------------------------
 
-def create_revenue_trend_chart(current_data, previous_data,
-                               current_year, previous_year):
-    """Revenue trend line chart (solid current, dashed previous)."""
+def _empty_fig(message):
+    """Placeholder figure with a centred message instead of a chart."""
     fig = go.Figure()
+    fig.add_annotation(text=message, xref="paper", yref="paper",
+                       x=0.5, y=0.5, showarrow=False)
+    fig.update_layout(height=350, xaxis=dict(visible=False),
+                      yaxis=dict(visible=False), plot_bgcolor='white')
+    return fig
+
 
-    current_months = current_data['purchase_month'].nunique()
+def create_revenue_trend_chart(current_revenue, previous_revenue,
+                               current_year, previous_year):
+    """Revenue trend line chart (solid current, dashed previous).
 
-    if current_months > 1:
-        cur = current_data.groupby('purchase_month')['price'].sum().reset_index()
+    Both revenue arguments are monthly totals indexed by month; an empty
+    ``previous_revenue`` hides the comparison trace.
+    """
+    if current_revenue.empty and previous_revenue.empty:
+        return _empty_fig("No sales in the selected period")
+
+    fig = go.Figure()
+
+    if len(current_revenue) > 1:
         fig.add_trace(go.Scatter(
-            x=cur['purchase_month'], y=cur['price'],
+            x=current_revenue.index, y=current_revenue.values,
             mode='lines+markers',
             name=str(current_year),
             line=dict(color='#1f77b4', width=3),
             marker=dict(size=8),
         ))
 
-        if previous_data is not None and not previous_data.empty:
-            prev = previous_data.groupby('purchase_month')['price'].sum().reset_index()
+        if not previous_revenue.empty:
             fig.add_trace(go.Scatter(
-                x=prev['purchase_month'], y=prev['price'],
+                x=previous_revenue.index, y=previous_revenue.values,
                 mode='lines+markers',
                 name=str(previous_year),
                 line=dict(color='#7baaf0', width=3, dash='dash'),
@@ -175,72 +264,41 @@ def create_revenue_trend_chart(current_data, previous_data,
         fig.update_layout(title="Monthly Revenue Trend",
                           xaxis_title="Month", yaxis_title="Revenue")
     else:
-        cur_rev = current_data['price'].sum()
-        prev_rev = (previous_data['price'].sum()
-                    if previous_data is not None and not previous_data.empty else 0)
         fig.add_trace(go.Bar(
             x=[str(current_year), str(previous_year)],
-            y=[cur_rev, prev_rev],
+            y=[current_revenue.sum(), previous_revenue.sum()],
             marker=dict(color=['#1f77b4', '#7baaf0']),
-            text=[format_currency_short(cur_rev),
-                  format_currency_short(prev_rev)],
+            texttemplate='$%{y:.3~s}',
             textposition='outside',
         ))
         fig.update_layout(title="Revenue Comparison",
                           xaxis_title="Year", yaxis_title="Revenue")
 
-    # Compute nice tick values for K/M formatting on the Y axis
-    all_y = list(current_data.groupby('purchase_month')['price'].sum())
-    if previous_data is not None and not previous_data.empty:
-        all_y += list(previous_data.groupby('purchase_month')['price'].sum())
-    if all_y:
-        y_max = max(all_y) * 1.15
-        step = _nice_step(y_max)
-        tick_vals = list(np.arange(0, y_max + step, step))
-        tick_text = [_tick_currency(v) for v in tick_vals]
-    else:
-        tick_vals, tick_text = None, None
-
     fig.update_layout(
         showlegend=True,
         hovermode='x unified',
         plot_bgcolor='white',
         xaxis=dict(showgrid=True, gridcolor='#f0f0f0'),
-        yaxis=dict(showgrid=True, gridcolor='#f0f0f0',
-                   tickvals=tick_vals, ticktext=tick_text),
+        yaxis=dict(showgrid=True, gridcolor='#f0f0f0', rangemode='tozero',
+                   tickprefix='$', tickformat='~s'),
         height=350,
         margin=dict(t=50, b=50, l=60, r=30),
     )
     return fig
 
 
-def _nice_step(y_max):
-    """Choose a round tick step for the Y axis."""
-    raw = y_max / 5
-    magnitude = 10 ** int(np.floor(np.log10(max(raw, 1))))
-    residual = raw / magnitude
-    if residual <= 1:
-        nice = 1
-    elif residual <= 2:
-        nice = 2
-    elif residual <= 5:
-        nice = 5
-    else:
-        nice = 10
-    return nice * magnitude
-
+def create_category_chart(category_revenue):
+    """Top 10 categories horizontal bar chart, sorted descending, blue gradient.
 
-def create_category_chart(sales_data):
-    """Top 10 categories horizontal bar chart, sorted descending, blue gradient."""
-    if 'product_category_name' not in sales_data.columns:
-        fig = go.Figure()
-        fig.add_annotation(text="Product category data not available",
-                           xref="paper", yref="paper", x=0.5, y=0.5,
-                           showarrow=False)
-        return fig
+    ``category_revenue`` is revenue indexed by category, or None when the
+    product data is missing.
+    """
+    if category_revenue is None:
+        return _empty_fig("Product category data not available")
+    if category_revenue.empty:
+        return _empty_fig("No category sales in the selected period")
 
-    cat_rev = (sales_data.groupby('product_category_name')['price']
-               .sum().sort_values(ascending=True).tail(10))
+    cat_rev = category_revenue.sort_values(ascending=True).tail(10)
 
     fig = go.Figure(data=[
         go.Bar(
@@ -249,25 +307,19 @@ def create_category_chart(sales_data):
             orientation='h',
             marker=dict(color=cat_rev.values, colorscale='Blues',
                         showscale=False),
-            text=[format_currency_short(v) for v in cat_rev.values],
+            texttemplate='$%{x:.3~s}',
             textposition='outside',
-            hovertemplate='%{y}<br>Revenue: %{text}<extra></extra>',
+            hovertemplate='%{y}<br>Revenue: $%{x:.3~s}<extra></extra>',
         )
     ])
 
-    # K/M tick values on X axis
-    x_max = cat_rev.max() * 1.25
-    step = _nice_step(x_max)
-    tick_vals = list(np.arange(0, x_max + step, step))
-    tick_text = [_tick_currency(v) for v in tick_vals]
-
     fig.update_layout(
         title="Top 10 Product Categories",
         xaxis_title="Revenue",
         yaxis_title="",
         plot_bgcolor='white',
         xaxis=dict(showgrid=True, gridcolor='#f0f0f0',
-                   tickvals=tick_vals, ticktext=tick_text),
+                   tickprefix='$', tickformat='~s'),
         yaxis=dict(showgrid=False),
         height=350,
         margin=dict(t=50, b=50, l=150, r=60),
@@ -275,22 +327,20 @@ def create_category_chart(sales_data):
     return fig
 
 
-def create_state_map(sales_data):
-    """US choropleth map, blue gradient."""
-    if 'customer_state' not in sales_data.columns:
-        fig = go.Figure()
-        fig.add_annotation(text="Geographic data not available",
-                           xref="paper", yref="paper", x=0.5, y=0.5,
-                           showarrow=False)
-        return fig
+def create_state_map(state_revenue):
+    """US choropleth map, blue gradient.
 
-    state_rev = (sales_data.groupby('customer_state')['price']
-                 .sum().reset_index())
-    state_rev.columns = ['state', 'revenue']
+    ``state_revenue`` is revenue indexed by state, or None when the
+    customer data is missing.
+    """
+    if state_revenue is None:
+        return _empty_fig("Geographic data not available")
+    if state_revenue.empty:
+        return _empty_fig("No state sales in the selected period")
 
     fig = go.Figure(data=go.Choropleth(
-        locations=state_rev['state'],
-        z=state_rev['revenue'],
+        locations=state_revenue.index,
+        z=state_revenue.values,
         locationmode='USA-states',
         colorscale='Blues',
         showscale=True,
@@ -305,43 +355,23 @@ def create_state_map(sales_data):
     return fig
 
 
-def create_satisfaction_delivery_chart(sales_data):
-    """Bar chart: delivery-time buckets (x) vs avg review score (y)."""
-    if ('delivery_days' not in sales_data.columns
-            or 'review_score' not in sales_data.columns):
-        fig = go.Figure()
-        fig.add_annotation(text="Delivery or review data not available",
-                           xref="paper", yref="paper", x=0.5, y=0.5,
-                           showarrow=False)
-        return fig
-
-    def _bucket(days):
-        if pd.isna(days):
-            return 'Unknown'
-        if days <= 3:
-            return '1-3 days'
-        if days <= 7:
-            return '4-7 days'
-        return '8+ days'
-
-    tmp = sales_data.copy()
-    tmp['delivery_bucket'] = tmp['delivery_days'].apply(_bucket)
-
-    avg_scores = (tmp[tmp['delivery_bucket'] != 'Unknown']
-                  .groupby('delivery_bucket')['review_score']
-                  .mean().reset_index())
-
-    order = ['1-3 days', '4-7 days', '8+ days']
-    avg_scores['delivery_bucket'] = pd.Categorical(
-        avg_scores['delivery_bucket'], categories=order, ordered=True)
-    avg_scores = avg_scores.sort_values('delivery_bucket')
+def create_satisfaction_delivery_chart(avg_scores):
+    """Bar chart: delivery-time buckets (x) vs avg review score (y).
+
+    ``avg_scores`` is the average review score indexed by delivery bucket,
+    or None when delivery or review data is missing.
+    """
+    if avg_scores is None:
+        return _empty_fig("Delivery or review data not available")
+    if avg_scores.empty:
+        return _empty_fig("No reviewed deliveries in the selected period")
 
     fig = go.Figure(data=[
         go.Bar(
-            x=avg_scores['delivery_bucket'],
-            y=avg_scores['review_score'],
+            x=avg_scores.index.astype(str),
+            y=avg_scores.values,
             marker=dict(color='#1f77b4'),
-            text=[f'{v:.2f}' for v in avg_scores['review_score']],
+            texttemplate='%{y:.2f}',
             textposition='outside',
         )
     ])
@@ -376,8 +406,7 @@ def main():
     with hdr_left:
         st.title("E-commerce Analytics Dashboard")
 
-    orders_data = processed_data['orders']
-    available_years = sorted(orders_data['purchase_year'].unique(), reverse=True)
+    available_years = processed_data['available_years']
 
     with hdr_year:
         default_idx = (available_years.index(2023)
@@ -386,151 +415,155 @@ def main():
                                      index=default_idx, key="year_filter")
 
     with hdr_month:
-        month_names = [calendar.month_name[i] for i in range(1, 13)]
-        month_opts = ['All Months'] + month_names
-        month_display = st.selectbox("Month", month_opts,
-                                     index=0, key="month_filter")
-        selected_month = (None if month_display == 'All Months'
-                          else month_opts.index(month_display))
-
-    # -----------------------------------------------------------------------
-    # Build datasets
-    # -----------------------------------------------------------------------
-    current_data = loader.create_sales_dataset(
-        year_filter=selected_year,
-        month_filter=selected_month,
-        status_filter='delivered',
-    )
+        selected_month = st.selectbox(
+            "Month", [None] + list(range(1, 13)), index=0,
+            format_func=lambda m: ('All Months' if m is None
+                                   else calendar.month_name[m]),
+            key="month_filter")
 
     previous_year = selected_year - 1
-    previous_data = None
-    if previous_year in available_years:
-        previous_data = loader.create_sales_dataset(
-            year_filter=previous_year,
-            month_filter=selected_month,
-            status_filter='delivered',
-        )
 
     # -----------------------------------------------------------------------
     # Calculate KPI values
     # -----------------------------------------------------------------------
-    total_revenue = current_data['price'].sum()
-    total_orders = current_data['order_id'].nunique()
-    avg_order_value = current_data.groupby('order_id')['price'].sum().mean()
-
-    prev_revenue = (previous_data['price'].sum()
-                    if previous_data is not None else 0)
-    prev_orders = (previous_data['order_id'].nunique()
-                   if previous_data is not None else 0)
-    prev_aov = (previous_data.groupby('order_id')['price'].sum().mean()
-                if previous_data is not None else 0)
-
-    monthly_sums = current_data.groupby('purchase_month')['price'].sum()
+    kpi_by_month = processed_data['kpi_by_month']
+
+    current_kpi = select_period(kpi_by_month, selected_year, selected_month)
+    total_revenue = current_kpi['revenue'].sum()
+    total_orders = current_kpi['orders'].sum()
+    avg_order_value = total_revenue / total_orders if total_orders else 0
+
+    previous_kpi = select_period(kpi_by_month, previous_year, selected_month)
+    prev_revenue = previous_kpi['revenue'].sum()
+    prev_orders = previous_kpi['orders'].sum()
+    prev_aov = prev_revenue / prev_orders if prev_orders else 0
+
+    monthly_sums = current_kpi['revenue']
     monthly_growth = (monthly_sums.pct_change().mean() * 100
                       if len(monthly_sums) > 1 else 0)
 
     # -----------------------------------------------------------------------
     # KPI row — 4 cards
     # -----------------------------------------------------------------------
-    k1, k2, k3, k4 = st.columns(4)
-
-    with k1:
-        st.markdown(f"""
+    growth_arrow, growth_css = ARROWS[monthly_growth >= 0]
+    st.markdown(f"""
+    <div class="kpi-grid">
         <div class="metric-card">
             <p class="metric-label">Total Revenue</p>
             <p class="metric-value">{format_currency_short(total_revenue)}</p>
             <p class="metric-trend">{format_trend(total_revenue, prev_revenue)}</p>
-        </div>""", unsafe_allow_html=True)
-
-    with k2:
-        css = "trend-positive" if monthly_growth >= 0 else "trend-negative"
-        arrow = "\u2197" if monthly_growth >= 0 else "\u2198"
-        st.markdown(f"""
+        </div>
         <div class="metric-card">
             <p class="metric-label">Monthly Growth</p>
             <p class="metric-value">{monthly_growth:.2f}%</p>
-            <p class="metric-trend"><span class="{css}">{arrow}</span></p>
-        </div>""", unsafe_allow_html=True)
-
-    with k3:
-        st.markdown(f"""
+            <p class="metric-trend"><span class="{growth_css}">{growth_arrow}</span></p>
+        </div>
         <div class="metric-card">
             <p class="metric-label">Average Order Value</p>
             <p class="metric-value">{format_currency_short(avg_order_value)}</p>
             <p class="metric-trend">{format_trend(avg_order_value, prev_aov)}</p>
-        </div>""", unsafe_allow_html=True)
-
-    with k4:
-        st.markdown(f"""
+        </div>
         <div class="metric-card">
             <p class="metric-label">Total Orders</p>
             <p class="metric-value">{total_orders:,}</p>
             <p class="metric-trend">{format_trend(total_orders, prev_orders)}</p>
-        </div>""", unsafe_allow_html=True)
+        </div>
+    </div>""", unsafe_allow_html=True)
 
     # -----------------------------------------------------------------------
     # Charts grid — 2 x 2
     # -----------------------------------------------------------------------
+    current_revenue = sum_period(kpi_by_month['revenue'], selected_year,
+                                 selected_month, 'purchase_month')
+    previous_revenue = sum_period(kpi_by_month['revenue'], previous_year,
+                                  selected_month, 'purchase_month')
+
+    category_revenue = None
+    if 'category_revenue' in processed_data:
+        category_revenue = sum_period(processed_data['category_revenue'],
+                                      selected_year, selected_month,
+                                      'product_category_name')
+
+    state_revenue = None
+    if 'state_revenue' in processed_data:
+        state_revenue = sum_period(processed_data['state_revenue'],
+                                   selected_year, selected_month,
+                                   'customer_state')
+
+    avg_scores = None
+    if 'delivery_satisfaction' in processed_data:
+        bucket_totals = sum_period(processed_data['delivery_satisfaction'],
+                                   selected_year, selected_month,
+                                   'delivery_bucket')
+        avg_scores = (bucket_totals['review_total']
+                      / bucket_totals['review_count'])
+
     r1c1, r1c2 = st.columns(2)
     r2c1, r2c2 = st.columns(2)
 
     with r1c1:
         st.plotly_chart(
-            create_revenue_trend_chart(current_data, previous_data,
+            create_revenue_trend_chart(current_revenue, previous_revenue,
                                        selected_year, previous_year),
             use_container_width=True)
     with r1c2:
-        st.plotly_chart(create_category_chart(current_data),
+        st.plotly_chart(create_category_chart(category_revenue),
                         use_container_width=True)
     with r2c1:
-        st.plotly_chart(create_state_map(current_data),
+        st.plotly_chart(create_state_map(state_revenue),
                         use_container_width=True)
     with r2c2:
-        st.plotly_chart(create_satisfaction_delivery_chart(current_data),
+        st.plotly_chart(create_satisfaction_delivery_chart(avg_scores),
                         use_container_width=True)
 
     # -----------------------------------------------------------------------
     # Bottom row — 2 cards
     # -----------------------------------------------------------------------
-    b1, b2 = st.columns(2)
-
-    with b1:
-        if 'delivery_days' in current_data.columns:
-            avg_del = current_data['delivery_days'].mean()
-            prev_del = (previous_data['delivery_days'].mean()
-                        if previous_data is not None else 0)
-            st.markdown(f"""
-            <div class="bottom-card">
-                <p class="metric-label">Average Delivery Time</p>
-                <p class="metric-value">{avg_del:.1f} days</p>
-                <p class="metric-trend">{format_trend(avg_del, prev_del)}</p>
-            </div>""", unsafe_allow_html=True)
-        else:
-            st.markdown("""
-            <div class="bottom-card">
-                <p class="metric-label">Average Delivery Time</p>
-                <p class="metric-value">N/A</p>
-                <p class="metric-trend">Data not available</p>
-            </div>""", unsafe_allow_html=True)
-
-    with b2:
-        if 'review_score' in current_data.columns:
-            avg_rev = current_data['review_score'].mean()
-            filled = int(round(avg_rev))
-            stars_str = "\u2605" * filled + "\u2606" * (5 - filled)
-            st.markdown(f"""
-            <div class="bottom-card">
-                <p class="metric-value">{avg_rev:.1f}/5.0</p>
-                <p class="stars">{stars_str}</p>
-                <p class="metric-label">Average Review Score</p>
-            </div>""", unsafe_allow_html=True)
-        else:
-            st.markdown("""
-            <div class="bottom-card">
-                <p class="metric-value">N/A</p>
-                <p class="metric-label">Average Review Score</p>
-                <p class="metric-trend">Data not available</p>
-            </div>""", unsafe_allow_html=True)
+    avg_del = prev_del = avg_rev = np.nan
+    if 'delivery_total' in kpi_by_month.columns:
+        avg_del = safe_ratio(current_kpi['delivery_total'].sum(),
+                             current_kpi['delivery_count'].sum())
+        prev_del = safe_ratio(previous_kpi['delivery_total'].sum(),
+                              previous_kpi['delivery_count'].sum())
+    if 'review_total' in kpi_by_month.columns:
+        avg_rev = safe_ratio(current_kpi['review_total'].sum(),
+                             current_kpi['review_count'].sum())
+
+    # NaN covers both a missing column and a period with nothing to average
+    if not pd.isna(avg_del):
+        delivery_card = f"""
+        <div class="bottom-card">
+            <p class="metric-label">Average Delivery Time</p>
+            <p class="metric-value">{avg_del:.1f} days</p>
+            <p class="metric-trend">{format_trend(avg_del, prev_del)}</p>
+        </div>"""
+    else:
+        delivery_card = """
+        <div class="bottom-card">
+            <p class="metric-label">Average Delivery Time</p>
+            <p class="metric-value">N/A</p>
+            <p class="metric-trend">Data not available</p>
+        </div>"""
+
+    if not pd.isna(avg_rev):
+        stars_str = STARS[int(round(avg_rev))]
+        review_card = f"""
+        <div class="bottom-card">
+            <p class="metric-value">{avg_rev:.1f}/5.0</p>
+            <p class="stars">{stars_str}</p>
+            <p class="metric-label">Average Review Score</p>
+        </div>"""
+    else:
+        review_card = """
+        <div class="bottom-card">
+            <p class="metric-value">N/A</p>
+            <p class="metric-label">Average Review Score</p>
+            <p class="metric-trend">Data not available</p>
+        </div>"""
+
+    st.markdown(f"""
+    <div class="bottom-grid">{delivery_card}{review_card}
+    </div>""", unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
@@ -2,12 +2,35 @@
 Data loading and processing module for e-commerce data analysis.
 """
 
+import os
+
 import pandas as pd
 import numpy as np
 from typing import Dict, Tuple, Optional
-import warnings
 
-warnings.filterwarnings('ignore')
+# Optional pyarrow import (enables Parquet storage)
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+FILE_MAPPINGS = {
+    'orders': 'orders_dataset.csv',
+    'order_items': 'order_items_dataset.csv',
+    'products': 'products_dataset.csv',
+    'customers': 'customers_dataset.csv',
+    'reviews': 'order_reviews_dataset.csv',
+    'payments': 'order_payments_dataset.csv'
+}
+
+# Low-cardinality label columns stored as categoricals in Parquet copies
+PARQUET_CATEGORY_COLUMNS = {
+    'orders': ['order_status'],
+    'products': ['product_category_name'],
+    'customers': ['customer_state'],
+    'payments': ['payment_type']
+}
 
 
 class EcommerceDataLoader:
@@ -28,24 +51,23 @@ class EcommerceDataLoader:
     
     def load_raw_data(self) -> Dict[str, pd.DataFrame]:
         """
-        Load all raw CSV files into DataFrames.
+        Load all raw data files into DataFrames.
+        
+        A Parquet copy of a dataset (see ``convert_csv_to_parquet``) is read
+        in place of its CSV when present and pyarrow is installed.
         
         Returns:
             Dict[str, pd.DataFrame]: Dictionary containing all raw datasets
         """
-        file_mappings = {
-            'orders': 'orders_dataset.csv',
-            'order_items': 'order_items_dataset.csv',
-            'products': 'products_dataset.csv',
-            'customers': 'customers_dataset.csv',
-            'reviews': 'order_reviews_dataset.csv',
-            'payments': 'order_payments_dataset.csv'
-        }
-        
         load_summary = {}
-        for key, filename in file_mappings.items():
+        for key, filename in FILE_MAPPINGS.items():
+            csv_path = f"{self.data_path}{filename}"
+            parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
             try:
-                self.raw_data[key] = pd.read_csv(f"{self.data_path}{filename}")
+                if HAS_PYARROW and os.path.exists(parquet_path):
+                    self.raw_data[key] = pd.read_parquet(parquet_path)
+                else:
+                    self.raw_data[key] = pd.read_csv(csv_path)
                 load_summary[key] = {'records': len(self.raw_data[key]), 'status': 'loaded'}
             except FileNotFoundError:
                 load_summary[key] = {'records': 0, 'status': 'not_found'}
@@ -76,8 +98,8 @@ class EcommerceDataLoader:
                 orders[col] = pd.to_datetime(orders[col])
         
         # Extract date components
-        orders['purchase_year'] = orders['order_purchase_timestamp'].dt.year
-        orders['purchase_month'] = orders['order_purchase_timestamp'].dt.month
+        orders['purchase_year'] = orders['order_purchase_timestamp'].dt.year.astype('int16')
+        orders['purchase_month'] = orders['order_purchase_timestamp'].dt.month.astype('int8')
         orders['purchase_date'] = orders['order_purchase_timestamp'].dt.date
         
         return orders
@@ -115,8 +137,41 @@ class EcommerceDataLoader:
             if col in reviews.columns:
                 reviews[col] = pd.to_datetime(reviews[col])
         
+        # Scores are 1-5; nullable Int8 keeps missing reviews as <NA>
+        if 'review_score' in reviews.columns:
+            reviews['review_score'] = reviews['review_score'].astype('Int8')
+        
         return reviews
     
+    def clean_products_data(self) -> pd.DataFrame:
+        """
+        Clean and process products data.
+        
+        Returns:
+            pd.DataFrame: Cleaned products data
+        """
+        products = self.raw_data['products'].copy()
+        
+        # Low-cardinality labels: category dtype groups on integer codes
+        if 'product_category_name' in products.columns:
+            products['product_category_name'] = products['product_category_name'].astype('category')
+        
+        return products
+    
+    def clean_customers_data(self) -> pd.DataFrame:
+        """
+        Clean and process customers data.
+        
+        Returns:
+            pd.DataFrame: Cleaned customers data
+        """
+        customers = self.raw_data['customers'].copy()
+        
+        if 'customer_state' in customers.columns:
+            customers['customer_state'] = customers['customer_state'].astype('category')
+        
+        return customers
+    
     def create_sales_dataset(self, year_filter: Optional[int] = None, 
                            month_filter: Optional[int] = None,
                            status_filter: str = 'delivered') -> pd.DataFrame:
@@ -129,51 +184,55 @@ class EcommerceDataLoader:
             status_filter (str): Filter by order status (default: 'delivered')
         
         Returns:
-            pd.DataFrame: Comprehensive sales dataset
+            pd.DataFrame: Comprehensive sales dataset with one row per order
+            item; an order with several items spans several rows, so count
+            orders by distinct ``order_id`` rather than by rows
         """
-        # Start with order items
-        sales_data = self.processed_data['order_items'].copy()
-        
-        # Join with orders
-        sales_data = sales_data.merge(
-            self.processed_data['orders'][['order_id', 'customer_id', 'order_status', 
-                                         'order_purchase_timestamp', 'order_delivered_customer_date',
-                                         'purchase_year', 'purchase_month']],
-            on='order_id',
-            how='left'
-        )
+        # Filter orders before the join so only matching line items are merged
+        orders = self.processed_data['orders'][['order_id', 'customer_id', 'order_status',
+                                                'order_purchase_timestamp', 'order_delivered_customer_date',
+                                                'purchase_year', 'purchase_month']]
         
         # Filter by order status
         if status_filter:
-            sales_data = sales_data[sales_data['order_status'] == status_filter]
+            orders = orders[orders['order_status'] == status_filter]
         
         # Apply time filters
         if year_filter:
-            sales_data = sales_data[sales_data['purchase_year'] == year_filter]
+            orders = orders[orders['purchase_year'] == year_filter]
         
         if month_filter:
-            sales_data = sales_data[sales_data['purchase_month'] == month_filter]
+            orders = orders[orders['purchase_month'] == month_filter]
+        
+        # Any filter drops items without a matching order, so an inner join
+        # is equivalent there; unfiltered datasets keep every order item
+        filtered = bool(status_filter or year_filter or month_filter)
+        sales_data = self.processed_data['order_items'].merge(
+            orders,
+            on='order_id',
+            how='inner' if filtered else 'left'
+        )
         
         # Add product information
-        if 'products' in self.raw_data:
+        if 'products' in self.processed_data:
             sales_data = sales_data.merge(
-                self.raw_data['products'][['product_id', 'product_category_name']],
+                self.processed_data['products'][['product_id', 'product_category_name']],
                 on='product_id',
                 how='left'
             )
         
         # Add customer information (avoid duplicate joins)
-        if 'customers' in self.raw_data and 'customer_id' in sales_data.columns:
+        if 'customers' in self.processed_data and 'customer_id' in sales_data.columns:
             sales_data = sales_data.merge(
-                self.raw_data['customers'][['customer_id', 'customer_state', 'customer_city']],
+                self.processed_data['customers'][['customer_id', 'customer_state', 'customer_city']],
                 on='customer_id',
                 how='left'
             )
         
         # Add review information
-        if 'reviews' in self.raw_data:
+        if 'reviews' in self.processed_data:
             sales_data = sales_data.merge(
-                self.raw_data['reviews'][['order_id', 'review_score']],
+                self.processed_data['reviews'][['order_id', 'review_score']],
                 on='order_id',
                 how='left'
             )
@@ -183,7 +242,7 @@ class EcommerceDataLoader:
             sales_data['delivery_days'] = (
                 sales_data['order_delivered_customer_date'] - 
                 sales_data['order_purchase_timestamp']
-            ).dt.days
+            ).dt.days.astype('Int16')
         
         return sales_data
     
@@ -201,6 +260,12 @@ class EcommerceDataLoader:
         self.processed_data['orders'] = self.clean_orders_data()
         self.processed_data['order_items'] = self.clean_order_items_data()
         
+        if 'products' in self.raw_data:
+            self.processed_data['products'] = self.clean_products_data()
+        
+        if 'customers' in self.raw_data:
+            self.processed_data['customers'] = self.clean_customers_data()
+        
         if 'reviews' in self.raw_data:
             self.processed_data['reviews'] = self.clean_reviews_data()
         
@@ -253,6 +318,40 @@ def categorize_delivery_speed(days: float) -> str:
         return '8+ days'
 
 
+def convert_csv_to_parquet(data_path: str = 'ecommerce_data/') -> Dict[str, str]:
+    """
+    Write a Parquet copy of every CSV dataset for faster cold starts.
+    
+    Label columns in ``PARQUET_CATEGORY_COLUMNS`` are stored
+    dictionary-encoded and load back as pandas ``category`` dtype.
+    
+    Args:
+        data_path (str): Path to data directory
+    
+    Returns:
+        Dict[str, str]: Parquet file written for each dataset
+    """
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow is required to write Parquet files")
+    
+    written = {}
+    for key, filename in FILE_MAPPINGS.items():
+        csv_path = f"{data_path}{filename}"
+        if not os.path.exists(csv_path):
+            continue
+        
+        df = pd.read_csv(csv_path)
+        for col in PARQUET_CATEGORY_COLUMNS.get(key, []):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        
+        parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+        df.to_parquet(parquet_path, index=False)
+        written[key] = parquet_path
+    
+    return written
+
+
 def load_and_process_data(data_path: str = 'ecommerce_data/') -> Tuple[EcommerceDataLoader, Dict[str, pd.DataFrame]]:
     """
     Convenience function to load and process all data.